@@ -1,24 +1,94 @@
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 import great_expectations as gx
 import logging
 
+# integer primary keys are compared via bitmaps when their value range is at most this many times the number of keys
+_DENSE_KEY_RANGE_FACTOR = 8
+
+# when compared in parallel, datasets with more rows than this are split into row partitions (one per CPU)
+_PARALLEL_PARTITION_ROWS = 1_000_000
+
+
+@functools.lru_cache(maxsize=1)
+def _get_gx_context():
+    """
+    Shared Great Expectations data context (context discovery is expensive, so it is only done once per process).
+
+    Returns:
+        gx data context
+    """
+    return gx.get_context()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_thread_pool():
+    """
+    Shared thread pool for opt-in parallel comparisons (numpy/pandas release the GIL on elementwise operations).
+
+    Returns:
+        ThreadPoolExecutor instance (created once per process)
+    """
+    return ThreadPoolExecutor(max_workers=os.cpu_count())
+
+
+def _run_all(calls, parallel=False):
+    """
+    Run independent zero-argument callables, either one by one or concurrently on the shared thread pool.
+
+    Args:
+        calls: list of zero-argument callables
+        parallel: run calls concurrently on the shared thread pool
+
+    Returns:
+        results (list) return values of the calls in the same order
+    """
+    if not parallel:
+        return [call() for call in calls]
+
+    futures = [_get_thread_pool().submit(call) for call in calls]
+    return [future.result() for future in futures]
+
+
+def _to_list(values):
+    """
+    Convert ndarray to a list of Python/pandas scalars for detailed errors.
+
+    Args:
+        values: ndarray of values
+
+    Returns:
+        values (list), datetime and timedelta values boxed as pandas Timestamp/Timedelta (NaT stays NaT), same as
+        Series.tolist (raw numpy datetime64/timedelta64 arrays would turn into integer nanoseconds)
+    """
+    if values.dtype.kind in "mM":
+        return pd.Index(values).tolist()
+    return values.tolist()
+
 
 class GreatExpectationsValidator:
 
     _datasource_initialized = False  # Class-level flag to track datasource initialization
 
     def __init__(self):
-        self.context = gx.get_context()
+        self.context = _get_gx_context()
         self._register_gx_data_sources()
 
         # note: right now we support only the following 'standard' great expectations (need to more to config later)
-        self.supported_standard_expectations = {
-            "expect_table_columns_to_match_ordered_list",
-            "expect_table_row_count_to_equal"
+        # resolve dynamic references like "source" in expectation kwargs against target dataset columns and row count
+        # (returns a new kwargs dict so the original expectations config is left untouched)
+        self._standard_kwargs_resolvers = {
+            "expect_table_columns_to_match_ordered_list": lambda kwargs, target_columns, target_row_count: (
+                {**kwargs, "column_list": target_columns} if kwargs.get("column_list") == "source" else kwargs
+            ),
+            "expect_table_row_count_to_equal": lambda kwargs, target_columns, target_row_count: (
+                {**kwargs, "value": target_row_count} if kwargs.get("value") == "source" else kwargs
+            ),
         }
-        self.supported_custom_expectations = [
-            "custom_expect_row_values_to_match"
-        ]
 
     def _register_gx_data_sources(self, datasource_name="pandas_default"):
         """
@@ -55,26 +125,28 @@ class GreatExpectationsValidator:
         Returns:
             results (dict) detailed results about two datasets validations
         """
+        # source dataset details used for detailed errors (walk validator attribute chain only once)
+        source_data = validator.active_batch.data.dataframe
+        source_columns = source_data.columns
+        source_row_count = len(source_data)
+        target_columns = target_data.columns.tolist()
+        target_row_count = target_data.shape[0]
+
         results = {}
         for expectation in expectations:
-            expectation_type = str(expectation["expectation_type"])
+            expectation_type = expectation["expectation_type"]
 
             if expectation_type.startswith("custom_"):
                 # logging.warning("trying to execute custom expectation, please use appropriate function for that (aborting)")
                 continue
 
-            if expectation_type not in self.supported_standard_expectations:
+            resolver = self._standard_kwargs_resolvers.get(expectation_type)
+            if resolver is None:
                 logging.warning(f"expectation {expectation_type} is not supported at the moment (aborting)")
                 continue
 
-            kwargs = expectation.get("kwargs", {})
-
-            # handle dynamic references like "source" for columns or row counts (other expectations should slot in
-            # automatically
-            if expectation_type == "expect_table_columns_to_match_ordered_list" and "column_list" in kwargs and kwargs["column_list"] == "source":
-                kwargs["column_list"] = list(target_data.columns)
-            if expectation_type == "expect_table_row_count_to_equal" and "value" in kwargs and kwargs["value"] == "source":
-                kwargs["value"] = len(target_data)
+            # handle dynamic references like "source" for columns or row counts
+            kwargs = resolver(expectation.get("kwargs", {}), target_columns, target_row_count)
 
             # Apply the expectation
             result = getattr(validator, expectation_type)(**kwargs)
@@ -83,21 +155,22 @@ class GreatExpectationsValidator:
             else:
                 # add detailed differences for specific checks
                 if expectation_type == "expect_table_columns_to_match_ordered_list":
-                    expected_columns = validator.active_batch.data.dataframe.columns
-                    actual_columns = list(target_data.columns)
+                    actual_columns = target_data.columns
+                    # hash both sides once via the intersection, each difference is then a walk against it
+                    shared_columns = source_columns.intersection(actual_columns)
                     results[expectation_type] = {
                         "success": False,
                         "detailed_errors": {
-                            "missing_in_target_data": list(set(expected_columns) - set(actual_columns)),
-                            "missing_in_source_data": list(set(actual_columns) - set(expected_columns))
+                            "missing_in_target_data": source_columns.difference(shared_columns).tolist(),
+                            "missing_in_source_data": actual_columns.difference(shared_columns).tolist()
                         }
                     }
                 elif expectation_type == "expect_table_row_count_to_equal":
                     results[expectation_type] = {
                         "success": False,
                         "detailed_errors": {
-                            "source_data_row_count": validator.active_batch.data.dataframe.shape[0],
-                            "target_data_row_count": len(target_data)
+                            "source_data_row_count": source_row_count,
+                            "target_data_row_count": target_row_count
                         }
                     }
                 else:
@@ -106,7 +179,8 @@ class GreatExpectationsValidator:
         return results
 
     def apply_custom_expectations_to_datasets(
-            self, source_data: pd.DataFrame, target_data: pd.DataFrame, primary_key: str
+            self, source_data: pd.DataFrame, target_data: pd.DataFrame, primary_key: str, parallel: bool = False,
+            sample: int = None
     ):
         """
         Apply custom expectations: validate primary keys and compare row values for two datasets.
@@ -115,6 +189,9 @@ class GreatExpectationsValidator:
             source_data: Source dataset.
             target_data: Target dataset.
             primary_key: Primary key of both datasets.
+            parallel: Run independent comparisons concurrently on a shared thread pool (worth it for large datasets).
+            sample: Number of sampled rows used to skip full comparison of columns that look equal (see
+                compare_row_values_between_datasets).
 
         Returns:
             results (dict): Combined results of primary key and row value validations.
@@ -123,7 +200,7 @@ class GreatExpectationsValidator:
 
         # validate primary keys
         primary_key_results = self.compare_primary_keys_between_datasets(
-            source_data, target_data, primary_key
+            source_data, target_data, primary_key, parallel=parallel
         )
         results.update(primary_key_results)
 
@@ -133,14 +210,16 @@ class GreatExpectationsValidator:
 
         # compare row values for aligned datasets
         row_comparison_results = self.compare_row_values_between_datasets(
-            source_data, target_data, primary_key
+            source_data, target_data, primary_key, parallel=parallel, sample=sample
         )
-        results["custom_expect_row_values_to_match"] = row_comparison_results
+        results.update(row_comparison_results)
 
         return results
 
     @staticmethod
-    def compare_primary_keys_between_datasets(source_data: pd.DataFrame, target_data: pd.DataFrame, primary_key: str):
+    def compare_primary_keys_between_datasets(
+            source_data: pd.DataFrame, target_data: pd.DataFrame, primary_key: str, parallel: bool = False
+    ):
         """
         Validate that primary keys match between source and target datasets.
 
@@ -148,6 +227,7 @@ class GreatExpectationsValidator:
             source_data: source dataset
             target_data: target dataset
             primary_key: primary key of both datasets
+            parallel: scan source and target keys concurrently on a shared thread pool
 
         Returns:
             results (dict) detailed results about two datasets validations
@@ -158,80 +238,303 @@ class GreatExpectationsValidator:
             }
         }
 
-        # first of all heck for duplicates in the primary key
-        source_duplicates = source_data[source_data.duplicated(subset=[primary_key], keep=False)]
-        target_duplicates = target_data[target_data.duplicated(subset=[primary_key], keep=False)]
+        # first of all check for duplicates in the primary key (on the key column only, not the whole frame)
+        source_key = source_data[primary_key]
+        target_key = target_data[primary_key]
+        source_duplicated, target_duplicated = _run_all(
+            [
+                functools.partial(source_key.duplicated, keep=False),
+                functools.partial(target_key.duplicated, keep=False)
+            ],
+            parallel
+        )
+        source_keys = source_key.to_numpy()
+        target_keys = target_key.to_numpy()
+        source_duplicated = source_duplicated.to_numpy()
+        target_duplicated = target_duplicated.to_numpy()
 
-        if not source_duplicates.empty or not target_duplicates.empty:
+        if source_duplicated.any() or target_duplicated.any():
             results["custom_expect_primary_keys_to_match"]["success"] = False
             results["custom_expect_primary_keys_to_match"]["detailed_errors"] = {
-                "duplicate_keys_in_source": source_duplicates[primary_key].tolist(),
-                "duplicate_keys_in_target": target_duplicates[primary_key].tolist(),
+                "duplicate_keys_in_source": source_key[source_duplicated].drop_duplicates().tolist(),
+                "duplicate_keys_in_target": target_key[target_duplicated].drop_duplicates().tolist(),
             }
             # return immediately as another further checks will be ambiguous
             return results
 
-        # only then compare unique primary keys
-        source_keys = set(source_data[primary_key])
-        target_keys = set(target_data[primary_key])
-
-        missing_in_target = source_keys - target_keys
-        missing_in_source = target_keys - source_keys
+        # only then compare unique primary keys (uniqueness is guaranteed by the duplicate check above)
+        missing_in_target, missing_in_source = GreatExpectationsValidator._find_missing_keys(
+            source_keys, target_keys, parallel=parallel
+        )
 
-        results = {
-            "custom_expect_primary_keys_to_match": {
-                "success": True
-            }
-        }
-        if missing_in_target and missing_in_source:
-            results["custom_expect_row_values_to_match"]["detailed_errors"] = {}
+        if missing_in_target.size or missing_in_source.size:
             results["custom_expect_primary_keys_to_match"]["success"] = False
-            results["custom_expect_row_values_to_match"]["detailed_errors"] = {
-                "missing_in_target": list(missing_in_target),
-                "missing_in_source": list(missing_in_source)
+            results["custom_expect_primary_keys_to_match"]["detailed_errors"] = {
+                "missing_in_target": _to_list(missing_in_target),
+                "missing_in_source": _to_list(missing_in_source)
             }
         return results
 
     @staticmethod
-    def compare_row_values_between_datasets(source_data: pd.DataFrame, target_data: pd.DataFrame, primary_key: str):
+    def _find_missing_keys(source_keys: np.ndarray, target_keys: np.ndarray, parallel: bool = False):
+        """
+        Find unique keys present only in source or only in target keys. Never uses Python sets or list membership, the
+        approach depends on key dtype:
+            - object (strings, mixed) or different source and target dtypes: pandas Index.difference (hashtable based)
+            - dense integers (value range within _DENSE_KEY_RANGE_FACTOR x number of keys): bitmaps
+            - any other numeric or datetime keys: single numpy sort over both key sets
+
+        Args:
+            source_keys: unique source primary keys
+            target_keys: unique target primary keys
+            parallel: compute both object key differences concurrently on a shared thread pool
+
+        Returns:
+            (missing_in_target, missing_in_source) ndarrays of keys
+        """
+        if source_keys.dtype == object or source_keys.dtype != target_keys.dtype:
+            # strings and mixed keys can't be sorted reliably by numpy (and keys of different dtypes can't always be
+            # combined into one array, e.g. int64 and datetime64), use pandas hashtable instead
+            source_index = pd.Index(source_keys)
+            target_index = pd.Index(target_keys)
+            return _run_all([
+                lambda: source_index.difference(target_index).to_numpy(),
+                lambda: target_index.difference(source_index).to_numpy(),
+            ], parallel)
+
+        if source_keys.dtype.kind in "iu" and source_keys.size and target_keys.size:
+            low = int(min(source_keys.min(), target_keys.min()))
+            key_range = int(max(source_keys.max(), target_keys.max())) - low + 1
+            if key_range <= _DENSE_KEY_RANGE_FACTOR * (source_keys.size + target_keys.size):
+                # dense integer keys (e.g. database ids): mark keys in one bitmap per dataset and compare bitmaps
+                in_source = np.zeros(key_range, dtype=bool)
+                in_target = np.zeros(key_range, dtype=bool)
+                # offsets are computed in int64, narrow key dtypes (e.g. int8) would overflow on subtraction
+                source_offsets = np.subtract(source_keys, low, dtype=np.int64)
+                target_offsets = np.subtract(target_keys, low, dtype=np.int64)
+                in_source[source_offsets] = True
+                in_target[target_offsets] = True
+                # missing keys are taken from the original arrays (adding offsets back to low could change the dtype,
+                # e.g. uint64 keys above int64 range would become float64)
+                return (
+                    np.sort(source_keys[~in_target[source_offsets]]),
+                    np.sort(target_keys[~in_source[target_offsets]])
+                )
+
+        # other numeric keys: one sort over both key sets, keys seen only once are missing on the other side (their
+        # first position tells which dataset they came from)
+        _, first_positions, counts = np.unique(
+            np.concatenate([source_keys, target_keys]), return_index=True, return_counts=True
+        )
+        unmatched_positions = first_positions[counts == 1]
+        in_source = unmatched_positions < source_keys.size
+        return (
+            source_keys[unmatched_positions[in_source]],
+            target_keys[unmatched_positions[~in_source] - source_keys.size]
+        )
+
+    @staticmethod
+    def compare_row_values_between_datasets(
+            source_data: pd.DataFrame, target_data: pd.DataFrame, primary_key: str, parallel: bool = False,
+            sample: int = None
+    ):
         """
         Compare two dataset (must have same number of rows, columns, and primary key as a pre-requisite) values row by
         row.
 
-        NOTE: unique keys should match before this check is executed, otherwise it will fail due to only identical
-        labeled series objects could be compared together.
+        NOTE: unique keys should match before this check is executed, otherwise rows present in only one of the datasets
+        (source or target) are compared against missing values and reported as differences in every column.
+
+        NOTE: when sample is set, this check is no longer exhaustive: columns whose (seeded) random sample of rows
+        match are assumed equal and skipped, so differences outside the sample may be missed in those columns.
 
         Args:
             source_data: source dataset
             target_data: target dataset
             primary_key: primary key of both datasets
+            parallel: compare columns (and row partitions of large datasets) concurrently on a shared thread pool
+            sample: number of rows to sample per column before comparing it in full (None compares all columns in full,
+                otherwise must be positive)
 
         Returns:
             results (dict) detailed results about two datasets validations
         """
+        if sample is not None and sample <= 0:
+            raise ValueError(f"sample must be a positive number of rows, got {sample}")
+
         # align rows
         source_data = source_data.set_index(primary_key, inplace=False)
         target_data = target_data.set_index(primary_key, inplace=False)
 
+        # positional comparisons below rely on both datasets having the same rows in the same order (source order first,
+        # then keys found only in target, so rows missing on either side are compared against missing values)
+        if not target_data.index.equals(source_data.index):
+            target_only_keys = target_data.index.difference(source_data.index, sort=False)
+            if not target_only_keys.empty:
+                source_data = source_data.reindex(source_data.index.append(target_only_keys))
+            target_data = target_data.reindex(source_data.index)
+
         results = {
             "custom_expect_row_values_to_match": {
                 "success": True
             }
         }
-        for column in source_data.columns:
-            if column in target_data.columns:
-                diff_rows = source_data[column] != target_data[column]
-                if diff_rows.any():
-                    results["custom_expect_row_values_to_match"]["detailed_errors"] = {}
-                    results["custom_expect_row_values_to_match"]["success"] = False
-                    results["custom_expect_row_values_to_match"]["detailed_errors"][column] = {
-                        "row_indices": source_data.index[diff_rows].tolist(),
-                        "source_data_values": source_data.loc[diff_rows, column].tolist(),
-                        "target_data_values": target_data.loc[diff_rows, column].tolist(),
-                    }
+
+        # only compare shared columns (usually both datasets have identical columns, then there is nothing to select)
+        if not source_data.columns.equals(target_data.columns):
+            common_columns = source_data.columns.intersection(target_data.columns)
+            source_data = source_data[common_columns]
+            target_data = target_data[common_columns]
+
+        if sample and len(source_data) > sample:
+            # only fully compare columns that already differ within a random sample of rows
+            sampled_rows = np.sort(np.random.default_rng(0).choice(len(source_data), sample, replace=False))
+            source_sample = source_data.iloc[sampled_rows]
+            target_sample = target_data.iloc[sampled_rows]
+            # (same comparison as the full check, so missing values behave the same in both)
+            sampled_diff_columns = source_data.columns[[
+                GreatExpectationsValidator._find_diff_in_column(
+                    source_sample[column], target_sample[column]
+                )[0].size > 0
+                for column in source_data.columns
+            ]]
+            source_data = source_data[sampled_diff_columns]
+            target_data = target_data[sampled_diff_columns]
+
+        if parallel and len(source_data) > _PARALLEL_PARTITION_ROWS:
+            column_diffs = GreatExpectationsValidator._find_column_diffs_by_partition(source_data, target_data)
+        else:
+            column_diffs = GreatExpectationsValidator._find_column_diffs(source_data, target_data, parallel=parallel)
+        if not column_diffs:
+            return results
+
+        results["custom_expect_row_values_to_match"]["success"] = False
+        results["custom_expect_row_values_to_match"]["detailed_errors"] = {}
+
+        for column, (diff_rows, source_values, target_values) in column_diffs.items():
+            results["custom_expect_row_values_to_match"]["detailed_errors"][column] = {
+                "row_indices": source_data.index.take(diff_rows).tolist(),
+                "source_data_values": _to_list(source_values),
+                "target_data_values": _to_list(target_values),
+            }
 
         return results
 
+    @staticmethod
+    def _find_column_diffs_by_partition(source_data: pd.DataFrame, target_data: pd.DataFrame):
+        """
+        Same as _find_column_diffs, but splits rows of large datasets into partitions (one per CPU) which are compared
+        concurrently on the shared thread pool and then combined.
+
+        Args:
+            source_data: aligned source dataset
+            target_data: aligned target dataset
+
+        Returns:
+            column_diffs (dict) column name -> (row positions, source values, target values) ndarrays, only for
+            columns with differences
+        """
+        bounds = np.linspace(0, len(source_data), (os.cpu_count() or 1) + 1, dtype=int)
+        partitions = list(zip(bounds[:-1], bounds[1:]))
+
+        # partitions are compared serially inside, they already occupy the shared thread pool
+        partition_diffs = _run_all(
+            [
+                functools.partial(
+                    GreatExpectationsValidator._find_column_diffs,
+                    source_data.iloc[start:stop], target_data.iloc[start:stop]
+                )
+                for start, stop in partitions
+            ],
+            parallel=True
+        )
+
+        column_parts = {}
+        for (start, _), partition_diff in zip(partitions, partition_diffs):
+            for column, (diff_rows, source_values, target_values) in partition_diff.items():
+                column_parts.setdefault(column, []).append((diff_rows + start, source_values, target_values))
+
+        return {
+            column: tuple(np.concatenate(parts) for parts in zip(*column_parts[column]))
+            for column in source_data.columns if column in column_parts
+        }
+
+    @staticmethod
+    def _find_column_diffs(source_data: pd.DataFrame, target_data: pd.DataFrame, parallel: bool = False):
+        """
+        Find rows that differ between two aligned datasets (same index and columns), per column. Each column is pulled
+        out as an array only once and the same array is used both to compare and to gather the differing values.
+
+        Args:
+            source_data: aligned source dataset
+            target_data: aligned target dataset
+            parallel: compare mixed dtype columns concurrently on a shared thread pool
+
+        Returns:
+            column_diffs (dict) column name -> (row positions, source values, target values) ndarrays, only for
+            columns with differences
+        """
+        dtypes = set(source_data.dtypes) | set(target_data.dtypes)
+        if len(dtypes) == 1:
+            dtype = dtypes.pop()
+            if isinstance(dtype, np.dtype) and dtype.kind in "biuf":
+                # single primitive dtype: compare both datasets as 2D arrays in one pass, transposed so that the
+                # (column, row) positions of differences come out already grouped by column
+                source_values = source_data.to_numpy()
+                target_values = target_data.to_numpy()
+                column_positions, row_positions = np.nonzero((source_values != target_values).T)
+                diff_columns, starts = np.unique(column_positions, return_index=True)
+                return {
+                    source_data.columns[position]: (diff_rows, source_values[diff_rows, position],
+                                                    target_values[diff_rows, position])
+                    for position, diff_rows in zip(diff_columns, np.split(row_positions, starts[1:]))
+                }
+
+        # mixed or object dtypes: compare column by column
+        column_diffs = _run_all(
+            [
+                functools.partial(
+                    GreatExpectationsValidator._find_diff_in_column, source_data[column], target_data[column]
+                )
+                for column in source_data.columns
+            ],
+            parallel
+        )
+        return {
+            column: column_diff
+            for column, column_diff in zip(source_data.columns, column_diffs) if column_diff[0].size
+        }
+
+    @staticmethod
+    def _find_diff_in_column(source_column: pd.Series, target_column: pd.Series):
+        """
+        Compare two aligned columns element by element.
+
+        Args:
+            source_column: aligned source column
+            target_column: aligned target column
+
+        Returns:
+            column_diff (tuple) row positions, source values and target values ndarrays where values differ
+        """
+        source_values = source_column.to_numpy()
+        target_values = target_column.to_numpy()
+        source_dtype, target_dtype = source_column.dtype, target_column.dtype
+        if isinstance(source_dtype, np.dtype) and isinstance(target_dtype, np.dtype) and (
+                (source_dtype.kind in "biufc" and target_dtype.kind in "biufc")
+                or (source_dtype == target_dtype and source_dtype.kind in "mM")
+        ):
+            # primitive numpy columns: compare raw arrays directly, skipping pandas Series ops and index checks
+            diff_mask = np.not_equal(source_values, target_values)
+        else:
+            # object and extension dtypes (nullable, string, arrow backed) keep pandas NA aware comparison, arrow backed
+            # ones are dispatched to pyarrow compute kernels by pandas itself; missing comparison results count as
+            # differences
+            diff_mask = (source_column != target_column).to_numpy(dtype=bool, na_value=True)
+
+        diff_rows = np.flatnonzero(diff_mask)
+        return diff_rows, source_values[diff_rows], target_values[diff_rows]
+
     # TODO: move to utilities function
     @staticmethod
     def all_expectations_successful(results):
@@ -244,4 +547,7 @@ class GreatExpectationsValidator:
         Returns:
             bool: True if all expectations are successful, False otherwise.
         """
-        return all(result["success"] for result in results.values())
\ No newline at end of file
+        for result in results.values():
+            if not result["success"]:
+                return False
+        return True
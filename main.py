@@ -60,7 +60,8 @@ if __name__ == "__main__":
     standard_expectation_results = gx_validator.apply_standard_expectations_to_datasets(
         validator=validator, expectations=expectations_list, target_data=target_data
     )
-    logging.info(f"standard expectations results: {standard_expectation_results}")
+    # lazy formatting: (potentially large) detailed errors are only rendered when INFO logging is enabled
+    logging.info("standard expectations results: %s", standard_expectation_results)
 
     if not gx_validator.all_expectations_successful(results=standard_expectation_results):
         logging.warning("one or more standard expectations failed (aborting)")
@@ -70,7 +71,7 @@ if __name__ == "__main__":
     custom_expectation_results = gx_validator.apply_custom_expectations_to_datasets(
         source_data=source_data, target_data=target_data, primary_key="id"
     )
-    logging.info(f"custom expectations results: {custom_expectation_results}")
+    logging.info("custom expectations results: %s", custom_expectation_results)
     if not gx_validator.all_expectations_successful(results=custom_expectation_results):
         logging.warning("one or more custom expectations failed (aborting)")
         sys.exit(1)
@@ -2,12 +2,13 @@ import unittest
 import pandas as pd
 from unittest.mock import MagicMock, patch
 
-from lib.great_expectations_validator import GreatExpectationsValidator
+from lib.great_expectations_validator import GreatExpectationsValidator, _get_gx_context
 
 
 class TestGreatExpectationsValidator(unittest.TestCase):
     def setUp(self):
-        # Initialize the validator instance
+        # Initialize the validator instance (with a fresh gx context for every test)
+        _get_gx_context.cache_clear()
         self.validator = GreatExpectationsValidator()
 
     @patch("great_expectations.data_context.DataContext.get_context")
@@ -47,6 +48,142 @@ class TestGreatExpectationsValidator(unittest.TestCase):
         }
         self.assertEqual(result, expected_result)
 
+    def test_compare_primary_keys_between_datasets_duplicate_datetime_keys(self):
+        source_data = pd.DataFrame({"id": pd.to_datetime(["2024-01-01", "2024-01-01", "2024-01-02"])})
+        target_data = pd.DataFrame({"id": pd.to_datetime(["2024-01-01", "2024-01-02"])})
+
+        result = self.validator.compare_primary_keys_between_datasets(
+            source_data, target_data, primary_key="id"
+        )
+
+        expected_result = {
+            "custom_expect_primary_keys_to_match": {
+                "success": False,
+                "detailed_errors": {
+                    "duplicate_keys_in_source": [pd.Timestamp("2024-01-01")],
+                    "duplicate_keys_in_target": [],
+                },
+            }
+        }
+        self.assertEqual(result, expected_result)
+
+    def test_compare_primary_keys_between_datasets_missing_keys(self):
+        source_data = pd.DataFrame({"id": [1, 2, 3], "value": [100, 200, 300]})
+        target_data = pd.DataFrame({"id": [1, 2, 4], "value": [100, 200, 400]})
+
+        result = self.validator.compare_primary_keys_between_datasets(
+            source_data, target_data, primary_key="id"
+        )
+
+        expected_result = {
+            "custom_expect_primary_keys_to_match": {
+                "success": False,
+                "detailed_errors": {
+                    "missing_in_target": [3],
+                    "missing_in_source": [4],
+                },
+            }
+        }
+        self.assertEqual(result, expected_result)
+
+    def test_compare_primary_keys_between_datasets_sparse_keys(self):
+        source_data = pd.DataFrame({"id": [10 ** 9, 5, 7, 3 * 10 ** 9, 1]})
+        target_data = pd.DataFrame({"id": [7, 2 * 10 ** 9, 1, 4, 10 ** 9]})
+
+        result = self.validator.compare_primary_keys_between_datasets(
+            source_data, target_data, primary_key="id"
+        )
+
+        # keys too sparse for bitmaps, missing keys come back sorted
+        expected_result = {
+            "custom_expect_primary_keys_to_match": {
+                "success": False,
+                "detailed_errors": {
+                    "missing_in_target": [5, 3 * 10 ** 9],
+                    "missing_in_source": [4, 2 * 10 ** 9],
+                },
+            }
+        }
+        self.assertEqual(result, expected_result)
+
+    def test_compare_primary_keys_between_datasets_mismatched_key_dtypes(self):
+        source_data = pd.DataFrame({"id": [1, 2]})
+        target_data = pd.DataFrame({"id": pd.to_datetime(["2024-01-01", "2024-01-02"])})
+
+        result = self.validator.compare_primary_keys_between_datasets(
+            source_data, target_data, primary_key="id"
+        )
+
+        expected_result = {
+            "custom_expect_primary_keys_to_match": {
+                "success": False,
+                "detailed_errors": {
+                    "missing_in_target": [1, 2],
+                    "missing_in_source": [pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-02")],
+                },
+            }
+        }
+        self.assertEqual(result, expected_result)
+
+    def test_compare_primary_keys_between_datasets_datetime_keys(self):
+        source_data = pd.DataFrame({"id": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03"])})
+        target_data = pd.DataFrame({"id": pd.to_datetime(["2024-01-01", "2024-01-03", "2024-01-04"])})
+
+        result = self.validator.compare_primary_keys_between_datasets(
+            source_data, target_data, primary_key="id"
+        )
+
+        expected_result = {
+            "custom_expect_primary_keys_to_match": {
+                "success": False,
+                "detailed_errors": {
+                    "missing_in_target": [pd.Timestamp("2024-01-02")],
+                    "missing_in_source": [pd.Timestamp("2024-01-04")],
+                },
+            }
+        }
+        self.assertEqual(result, expected_result)
+
+    def test_compare_primary_keys_between_datasets_narrow_int_keys(self):
+        source_data = pd.DataFrame({"id": pd.Series(range(-100, 101), dtype="int8")})
+        target_data = pd.DataFrame({"id": pd.Series([key for key in range(-100, 101) if key != 0], dtype="int8")})
+
+        result = self.validator.compare_primary_keys_between_datasets(
+            source_data, target_data, primary_key="id"
+        )
+
+        expected_result = {
+            "custom_expect_primary_keys_to_match": {
+                "success": False,
+                "detailed_errors": {
+                    "missing_in_target": [0],
+                    "missing_in_source": [],
+                },
+            }
+        }
+        self.assertEqual(result, expected_result)
+
+    def test_compare_primary_keys_between_datasets_uint64_keys(self):
+        source_data = pd.DataFrame({"id": pd.Series([2 ** 63 + 1, 2 ** 63 + 2], dtype="uint64")})
+        target_data = pd.DataFrame({"id": pd.Series([2 ** 63 + 1, 2 ** 63 + 3], dtype="uint64")})
+
+        result = self.validator.compare_primary_keys_between_datasets(
+            source_data, target_data, primary_key="id"
+        )
+
+        expected_result = {
+            "custom_expect_primary_keys_to_match": {
+                "success": False,
+                "detailed_errors": {
+                    "missing_in_target": [2 ** 63 + 2],
+                    "missing_in_source": [2 ** 63 + 3],
+                },
+            }
+        }
+        self.assertEqual(result, expected_result)
+        self.assertIsInstance(result["custom_expect_primary_keys_to_match"]["detailed_errors"]["missing_in_target"][0],
+                              int)
+
     def test_compare_row_values_between_datasets(self):
         source_data = pd.DataFrame({"id": [1, 2, 3], "value": [100, 200, 301]})
         target_data = pd.DataFrame({"id": [1, 2, 3], "value": [100, 250, 300]})
@@ -69,6 +206,152 @@ class TestGreatExpectationsValidator(unittest.TestCase):
         }
         self.assertEqual(result, expected_result)
 
+    def test_compare_row_values_between_datasets_mismatched_keys(self):
+        source_data = pd.DataFrame({"id": [1, 2, 4], "value": [100, 200, 400]})
+        target_data = pd.DataFrame({"id": [3, 2, 1], "value": [300, 200, 100]})
+
+        result = self.validator.compare_row_values_between_datasets(
+            source_data, target_data, primary_key="id"
+        )
+
+        # rows present only in source (4) or only in target (3) are both reported as differences
+        self.assertFalse(result["custom_expect_row_values_to_match"]["success"])
+        value_errors = result["custom_expect_row_values_to_match"]["detailed_errors"]["value"]
+        self.assertEqual(value_errors["row_indices"], [4, 3])
+        self.assertEqual(value_errors["source_data_values"][0], 400)
+        self.assertTrue(pd.isna(value_errors["source_data_values"][1]))
+        self.assertTrue(pd.isna(value_errors["target_data_values"][0]))
+        self.assertEqual(value_errors["target_data_values"][1], 300)
+
+    def test_compare_row_values_between_datasets_missing_values(self):
+        source_data = pd.DataFrame({"id": [1, 2, 3], "value": [1.5, None, None], "name": ["a", None, "c"]})
+        target_data = pd.DataFrame({"id": [1, 2, 3], "value": [1.5, None, 3.5], "name": ["a", None, None]})
+
+        result = self.validator.compare_row_values_between_datasets(
+            source_data, target_data, primary_key="id"
+        )
+
+        # same as the original pandas != comparison, a missing value never equals anything (not even another missing
+        # value), so rows with values missing in both datasets are reported as differences too
+        self.assertFalse(result["custom_expect_row_values_to_match"]["success"])
+        detailed_errors = result["custom_expect_row_values_to_match"]["detailed_errors"]
+        self.assertEqual(detailed_errors["value"]["row_indices"], [2, 3])
+        self.assertEqual(detailed_errors["name"]["row_indices"], [2, 3])
+
+    def test_compare_row_values_between_datasets_object_na(self):
+        source_data = pd.DataFrame({"id": [1, 2, 3], "name": pd.Series(["a", pd.NA, "c"], dtype=object)})
+        target_data = pd.DataFrame({"id": [1, 2, 3], "name": pd.Series(["a", "b", "c"], dtype=object)})
+
+        result = self.validator.compare_row_values_between_datasets(
+            source_data, target_data, primary_key="id"
+        )
+
+        detailed_errors = result["custom_expect_row_values_to_match"]["detailed_errors"]
+        self.assertFalse(result["custom_expect_row_values_to_match"]["success"])
+        self.assertEqual(detailed_errors["name"]["row_indices"], [2])
+        self.assertIs(detailed_errors["name"]["source_data_values"][0], pd.NA)
+        self.assertEqual(detailed_errors["name"]["target_data_values"], ["b"])
+
+    def test_compare_row_values_between_datasets_datetime_values(self):
+        source_data = pd.DataFrame({
+            "id": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03"]),
+            "updated": pd.to_datetime(["2024-02-01", "2024-02-02", "2024-02-03"]),
+            "duration": pd.to_timedelta(["1 day", "2 days", "3 days"]),
+        })
+        target_data = source_data.copy()
+        target_data.loc[1, "updated"] = pd.NaT
+        target_data.loc[1, "duration"] = pd.Timedelta("5 days")
+
+        result = self.validator.compare_row_values_between_datasets(
+            source_data, target_data, primary_key="id"
+        )
+
+        # datetime keys and values are reported as pandas Timestamp/Timedelta, not integer nanoseconds
+        expected_result = {
+            "custom_expect_row_values_to_match": {
+                "success": False,
+                "detailed_errors": {
+                    "updated": {
+                        "row_indices": [pd.Timestamp("2024-01-02")],
+                        "source_data_values": [pd.Timestamp("2024-02-02")],
+                        "target_data_values": [pd.NaT],
+                    },
+                    "duration": {
+                        "row_indices": [pd.Timestamp("2024-01-02")],
+                        "source_data_values": [pd.Timedelta("2 days")],
+                        "target_data_values": [pd.Timedelta("5 days")],
+                    },
+                },
+            }
+        }
+        self.assertEqual(result, expected_result)
+
+    def test_compare_row_values_between_datasets_sample(self):
+        source_data = pd.DataFrame({"id": range(20), "inside": range(20), "outside": range(20)})
+        target_data = source_data.copy()
+        # "inside" differs on every row (so also within the sample), "outside" only on row 0, which is not among the
+        # sampled rows (5, 6, 9, 10 and 13 for the fixed seed)
+        target_data["inside"] += 1
+        target_data.loc[0, "outside"] = -1
+
+        result = self.validator.compare_row_values_between_datasets(
+            source_data, target_data, primary_key="id", sample=5
+        )
+
+        # column differing within the sample is compared and reported in full, the other one is assumed equal
+        detailed_errors = result["custom_expect_row_values_to_match"]["detailed_errors"]
+        self.assertEqual(list(detailed_errors), ["inside"])
+        self.assertEqual(detailed_errors["inside"]["row_indices"], list(range(20)))
+
+        # sample covering the whole dataset (or no sample at all) stays exhaustive
+        exhaustive_result = self.validator.compare_row_values_between_datasets(
+            source_data, target_data, primary_key="id"
+        )
+        self.assertEqual(list(exhaustive_result["custom_expect_row_values_to_match"]["detailed_errors"]),
+                         ["inside", "outside"])
+        for sample in (20, 50):
+            self.assertEqual(
+                self.validator.compare_row_values_between_datasets(
+                    source_data, target_data, primary_key="id", sample=sample
+                ),
+                exhaustive_result
+            )
+
+        for sample in (0, -1):
+            with self.assertRaises(ValueError):
+                self.validator.compare_row_values_between_datasets(
+                    source_data, target_data, primary_key="id", sample=sample
+                )
+
+    @patch("lib.great_expectations_validator.os.cpu_count", return_value=4)
+    @patch("lib.great_expectations_validator._PARALLEL_PARTITION_ROWS", 10)
+    def test_compare_row_values_between_datasets_partitioned(self, mock_cpu_count):
+        numeric_source_data = pd.DataFrame({"id": range(40), "a": range(40), "b": range(100, 140)})
+        mixed_source_data = numeric_source_data.assign(name=[f"name_{row}" for row in range(40)])
+
+        for source_data in (numeric_source_data, mixed_source_data):
+            # 4 partitions of 10 rows: differences in the first, both middle and the last partition (target rows
+            # shuffled, so they are aligned by primary key first)
+            target_data = source_data.copy()
+            target_data.loc[[0, 15, 39], "a"] = -1
+            target_data.loc[[25, 39], "b"] = -1
+            if "name" in source_data:
+                target_data.loc[[9, 30], "name"] = "changed"
+            target_data = target_data.sample(frac=1, random_state=0)
+
+            result = self.validator.compare_row_values_between_datasets(
+                source_data, target_data, primary_key="id", parallel=True
+            )
+
+            expected_result = self.validator.compare_row_values_between_datasets(
+                source_data, target_data, primary_key="id", parallel=False
+            )
+            self.assertEqual(result, expected_result)
+            self.assertEqual(
+                result["custom_expect_row_values_to_match"]["detailed_errors"]["a"],
+                {"row_indices": [0, 15, 39], "source_data_values": [0, 15, 39], "target_data_values": [-1, -1, -1]},
+            )
+
     def test_all_expectations_successful(self):
         results = {
             "expect_table_columns_to_match_ordered_list": {"success": True},
@@ -116,6 +399,30 @@ class TestGreatExpectationsValidator(unittest.TestCase):
 
         self.assertEqual(result, expected_result)
 
+    def test_apply_standard_expectations_to_datasets_source_references(self):
+        mock_validator = MagicMock()
+        mock_validator.active_batch.data.dataframe = pd.DataFrame({"id": [1, 2, 3], "value": [100, 200, 300]})
+        target_data = pd.DataFrame({"id": [1, 2, 3], "value": [100, 250, 300]})
+
+        expectations = [
+            {"expectation_type": "expect_table_columns_to_match_ordered_list", "kwargs": {"column_list": "source"}},
+            {"expectation_type": "expect_table_row_count_to_equal", "kwargs": {"value": "source"}},
+            {"expectation_type": "expect_column_values_to_be_unique", "kwargs": {"column": "id"}},
+        ]
+
+        self.validator.apply_standard_expectations_to_datasets(
+            validator=mock_validator, expectations=expectations, target_data=target_data
+        )
+
+        # "source" references are resolved against target dataset, unsupported expectations are skipped
+        mock_validator.expect_table_columns_to_match_ordered_list.assert_called_once_with(column_list=["id", "value"])
+        mock_validator.expect_table_row_count_to_equal.assert_called_once_with(value=3)
+        mock_validator.expect_column_values_to_be_unique.assert_not_called()
+
+        # caller's expectations config is left untouched
+        self.assertEqual(expectations[0]["kwargs"], {"column_list": "source"})
+        self.assertEqual(expectations[1]["kwargs"], {"value": "source"})
+
     def test_apply_custom_expectations_to_datasets(self):
         source_data = pd.DataFrame({"id": [1, 2, 3], "value": [100, 200, 300]})
         target_data = pd.DataFrame({"id": [1, 2, 3], "value": [100, 250, 300]})
@@ -140,3 +447,38 @@ class TestGreatExpectationsValidator(unittest.TestCase):
             },
         }
         self.assertEqual(result, expected_result)
+
+    def test_apply_custom_expectations_to_datasets_parallel(self):
+        # string primary keys, so the object key comparison also runs on the thread pool
+        source_data = pd.DataFrame({"id": ["k1", "k2", "k3"], "value": [100, 200, 300], "name": ["a", "b", "c"]})
+        target_data = pd.DataFrame({"id": ["k1", "k2", "k3"], "value": [100, 250, 300], "name": ["a", "b", "d"]})
+
+        result = self.validator.apply_custom_expectations_to_datasets(
+            source_data=source_data, target_data=target_data, primary_key="id", parallel=True
+        )
+
+        expected_result = self.validator.apply_custom_expectations_to_datasets(
+            source_data=source_data, target_data=target_data, primary_key="id"
+        )
+        self.assertEqual(result, expected_result)
+        self.assertEqual(
+            result["custom_expect_row_values_to_match"]["detailed_errors"]["name"],
+            {"row_indices": ["k3"], "source_data_values": ["c"], "target_data_values": ["d"]},
+        )
+
+        # mismatched string keys
+        target_data["id"] = ["k1", "k2", "k4"]
+        result = self.validator.apply_custom_expectations_to_datasets(
+            source_data=source_data, target_data=target_data, primary_key="id", parallel=True
+        )
+
+        expected_result = {
+            "custom_expect_primary_keys_to_match": {
+                "success": False,
+                "detailed_errors": {
+                    "missing_in_target": ["k3"],
+                    "missing_in_source": ["k4"],
+                },
+            }
+        }
+        self.assertEqual(result, expected_result)